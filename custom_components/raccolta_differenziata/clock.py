@@ -0,0 +1,49 @@
+"""Clock abstraction for Raccolta Differenziata."""
+from datetime import date, datetime, timedelta
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import DATA_CLOCK
+
+
+class Clock:
+    """Timezone-aware source of the current time.
+
+    Uses the time zone configured in Home Assistant, so the day rollover
+    happens at local midnight whatever the host time zone is.
+    """
+
+    def now(self) -> datetime:
+        """Return the current local time."""
+        return dt_util.now()
+
+    def today(self) -> date:
+        """Return the current local date."""
+        return self.now().date()
+
+
+class ManualClock(Clock):
+    """Clock that only moves when told to, for simulations."""
+
+    def __init__(self, start: datetime) -> None:
+        """Initialize the clock at the given time."""
+        self._now = dt_util.as_local(start)
+
+    def now(self) -> datetime:
+        """Return the simulated local time."""
+        return self._now
+
+    def set(self, value: datetime) -> None:
+        """Move the clock to the given time."""
+        self._now = dt_util.as_local(value)
+
+    def advance(self, delta: timedelta) -> None:
+        """Move the clock forward."""
+        self.set(self._now + delta)
+
+
+@callback
+def async_get_clock(hass: HomeAssistant) -> Clock:
+    """Return the clock shared by the integration."""
+    return hass.data.setdefault(DATA_CLOCK, Clock())
@@ -21,11 +21,17 @@ from .const import (
     CONF_NOTIFICHE_ATTIVE,
     CONF_NOTIFICHE_ORARIO,
     CONF_NOTIFICHE_ANTICIPO,
+    CONF_ORIZZONTE,
+    CONF_NOTIFICHE_JITTER,
     DEFAULT_ICON,
     DEFAULT_COLOR,
     DEFAULT_FREQUENCY,
     DEFAULT_NOTIFICATION_TIME,
     DEFAULT_NOTIFICATION_DAYS_BEFORE,
+    DEFAULT_NOTIFICATION_JITTER,
+    DEFAULT_SCHEDULE_HORIZON,
+    MAX_NOTIFICATION_JITTER,
+    MAX_SCHEDULE_HORIZON,
     FREQUENCY_WEEKLY,
     FREQUENCY_BIWEEKLY,
     FREQUENCY_MONTHLY,
@@ -212,6 +218,13 @@ class RaccoltaDifferenziataOptionsFlow(config_entries.OptionsFlow):
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema({
-                # Qui puoi aggiungere opzioni configurabili dopo l'installazione
+                vol.Required(
+                    CONF_ORIZZONTE,
+                    default=self.config_entry.options.get(CONF_ORIZZONTE, DEFAULT_SCHEDULE_HORIZON),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_SCHEDULE_HORIZON)),
+                vol.Required(
+                    CONF_NOTIFICHE_JITTER,
+                    default=self.config_entry.options.get(CONF_NOTIFICHE_JITTER, DEFAULT_NOTIFICATION_JITTER),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_NOTIFICATION_JITTER)),
             }),
         )
\ No newline at end of file
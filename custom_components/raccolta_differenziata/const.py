@@ -13,6 +13,8 @@ CONF_NOTIFICHE = "notifiche"
 CONF_NOTIFICHE_ATTIVE = "attive"
 CONF_NOTIFICHE_ORARIO = "orario"
 CONF_NOTIFICHE_ANTICIPO = "anticipo"
+CONF_ORIZZONTE = "orizzonte"
+CONF_NOTIFICHE_JITTER = "jitter"
 
 # Default values
 DEFAULT_ICON = "mdi:recycle"
@@ -20,6 +22,11 @@ DEFAULT_COLOR = "#4CAF50"
 DEFAULT_FREQUENCY = "settimanale"
 DEFAULT_NOTIFICATION_TIME = "19:00"
 DEFAULT_NOTIFICATION_DAYS_BEFORE = 1
+DEFAULT_NOTIFICATION_JITTER = 0  # secondi, 0 = invio immediato
+MAX_NOTIFICATION_JITTER = 3600  # secondi
+NOTIFICATION_CONCURRENCY = 4  # invii contemporanei per tutta l'installazione
+DEFAULT_SCHEDULE_HORIZON = 28  # giorni
+MAX_SCHEDULE_HORIZON = 366  # giorni
 
 # Frequency options
 FREQUENCY_WEEKLY = "settimanale"
@@ -68,4 +75,21 @@ TRANSLATIONS = {
         "notification_message": "Tomorrow is scheduled for {} collection",
         "notification_message_today": "Today is scheduled for {} collection",
     },
-}
\ No newline at end of file
+}
+
+# Write queue for service mutations
+DATA_WRITE_QUEUES = f"{DOMAIN}_write_queues"
+WRITE_QUEUE_DEBOUNCE = 0.1  # secondi
+
+# Performance instrumentation
+DATA_STATS = f"{DOMAIN}_stats"
+STATS_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Clock shared by coordinator, sensors and reminders
+DATA_CLOCK = f"{DOMAIN}_clock"
+
+# Coordinators by config entry, used by the services
+DATA_COORDINATORS = f"{DOMAIN}_coordinators"
+
+# Timer wheel shared by the reminders of every entry
+DATA_REMINDERS = f"{DOMAIN}_reminders"
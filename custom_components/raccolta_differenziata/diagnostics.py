@@ -0,0 +1,18 @@
+"""Diagnostics support for Raccolta Differenziata."""
+from typing import Any, Dict
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .stats import async_get_entry_stats
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> Dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    return {
+        "entry": {
+            "title": entry.title,
+            "data": dict(entry.data),
+        },
+        "performance": async_get_entry_stats(hass, entry).as_dict(),
+    }
@@ -0,0 +1,234 @@
+"""Waste collection reminders for Raccolta Differenziata."""
+import asyncio
+import logging
+import random
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_point_in_time
+
+from .clock import Clock, async_get_clock
+from .const import (
+    CONF_CONFERIMENTI,
+    CONF_NOTIFICHE_JITTER,
+    DATA_REMINDERS,
+    DEFAULT_NOTIFICATION_JITTER,
+    NOTIFICATION_CONCURRENCY,
+    TRANSLATIONS,
+)
+from .schedule import get_next_date
+from .stats import EntryStats
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def plan_reminders(
+    conferimenti: List[Dict[str, Any]],
+    anticipo: int,
+    today: date,
+    language: Optional[str],
+) -> List[Dict[str, Any]]:
+    """Return the notify service data of the collections due within the advance."""
+    translations = TRANSLATIONS.get(language or "en", TRANSLATIONS["en"])
+    reminders = []
+    
+    # Controlla se ci sono conferimenti per domani o oggi (in base all'anticipo configurato)
+    for conferimento in conferimenti:
+        tipo = conferimento.get("tipo", "")
+        
+        # Calcola la prossima data di conferimento
+        next_date = get_next_date(conferimento, today)
+        
+        # Verifica se la data è entro il periodo di notifica
+        days_until = (next_date - today).days
+        if days_until <= anticipo:
+            if days_until == 0:
+                message = translations["notification_message_today"].format(tipo)
+            else:
+                message = translations["notification_message"].format(tipo)
+            
+            reminders.append({
+                "title": translations["notification_title"],
+                "message": message,
+                "data": {
+                    "tag": f"raccolta_differenziata_{tipo}",
+                    "color": conferimento.get("colore", "#4CAF50"),
+                    "icon": conferimento.get("icona", "mdi:recycle"),
+                },
+            })
+    
+    return reminders
+
+
+async def async_send_reminder(hass: HomeAssistant, reminder: Dict[str, Any], stats: EntryStats) -> None:
+    """Send a single reminder, recording its outcome."""
+    stats.increment("notify_calls")
+    try:
+        with stats.timed("notify_send"):
+            await hass.services.async_call(
+                "notify",
+                "mobile_app",  # Usa il servizio mobile_app per le notifiche push
+                reminder,
+                blocking=True,  # Attendi l'invio: tempi ed errori sono quelli reali
+            )
+    except Exception as err:  # pylint: disable=broad-except
+        stats.increment("notify_failures")
+        _LOGGER.error("Error sending notification %s: %s", reminder["data"]["tag"], err)
+
+
+class ReminderJob:
+    """Reminder settings of a single config entry."""
+
+    def __init__(self, entry: ConfigEntry, anticipo: int, stats: EntryStats) -> None:
+        """Initialize the job."""
+        self.entry = entry
+        self.anticipo = anticipo
+        self.stats = stats
+        # Invii in corso e invii ritardati dal jitter, annullabili allo scarico
+        self.tasks: Set[asyncio.Task] = set()
+        self.timers: Set[CALLBACK_TYPE] = set()
+
+    @property
+    def jitter(self) -> float:
+        """Return the maximum random delay of the sends, in seconds."""
+        return self.entry.options.get(CONF_NOTIFICHE_JITTER, DEFAULT_NOTIFICATION_JITTER)
+
+    def plan(self, today: date, language: Optional[str]) -> List[Dict[str, Any]]:
+        """Return the reminders of the entry due today."""
+        with self.stats.timed("notify_plan"):
+            return plan_reminders(self.entry.data.get(CONF_CONFERIMENTI, []), self.anticipo, today, language)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel the delayed and running sends of the job."""
+        for unsub in self.timers:
+            unsub()
+        self.timers.clear()
+        for task in self.tasks:
+            task.cancel()
+        self.tasks.clear()
+
+
+class ReminderWheel:
+    """Timer wheel shared by the reminders of every config entry.
+
+    Jobs are grouped by minute of the day and a single timer is armed for the
+    next occupied slot. When it fires, the reminders of every job in the slot
+    are planned together and sent with an optional per-job jitter, within a
+    concurrency budget shared by the whole installation.
+    """
+
+    def __init__(self, hass: HomeAssistant, clock: Clock, concurrency: int = NOTIFICATION_CONCURRENCY) -> None:
+        """Initialize the wheel."""
+        self.hass = hass
+        self.clock = clock
+        self._slots: Dict[int, Dict[str, ReminderJob]] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._unsub: Optional[CALLBACK_TYPE] = None
+        self._next_slot: Optional[int] = None
+
+    @callback
+    def async_add_job(self, hour: int, minute: int, job: ReminderJob) -> Callable[[], None]:
+        """Add a job to the wheel and return a callback that removes it."""
+        slot = hour * 60 + minute
+        entry_id = job.entry.entry_id
+        self._slots.setdefault(slot, {})[entry_id] = job
+        self._async_arm()
+
+        @callback
+        def async_remove_job() -> None:
+            job.async_cancel()
+            jobs = self._slots.get(slot, {})
+            jobs.pop(entry_id, None)
+            if not jobs:
+                self._slots.pop(slot, None)
+            self._async_arm()
+
+        return async_remove_job
+
+    @callback
+    def _async_arm(self) -> None:
+        """Arm the timer for the next occupied slot."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._next_slot = None
+        if not self._slots:
+            return
+
+        now = self.clock.now()
+        next_fire: Optional[datetime] = None
+        for slot in self._slots:
+            fire = datetime.combine(now.date(), time(slot // 60, slot % 60), tzinfo=now.tzinfo)
+            if fire <= now:
+                fire = datetime.combine(now.date() + timedelta(days=1), time(slot // 60, slot % 60), tzinfo=now.tzinfo)
+            if next_fire is None or fire < next_fire:
+                next_fire, self._next_slot = fire, slot
+
+        self._unsub = async_track_point_in_time(self.hass, self._async_fire, next_fire)
+
+    @callback
+    def _async_fire(self, now: datetime) -> None:
+        """Plan the reminders of every job in the due slot and start the sends."""
+        self._unsub = None
+        jobs = list(self._slots.get(self._next_slot, {}).values())
+        self._async_arm()
+
+        today = self.clock.today()
+        language = self.hass.config.language
+        for job in jobs:
+            for reminder in job.plan(today, language):
+                self._async_schedule_send(job, reminder)
+
+    @callback
+    def _async_schedule_send(self, job: ReminderJob, reminder: Dict[str, Any]) -> None:
+        """Start a send now or after a random delay within the job jitter."""
+        delay = random.uniform(0, job.jitter) if job.jitter else 0
+        if not delay:
+            self._async_start_send(job, reminder)
+            return
+
+        @callback
+        def async_delayed_send(_now: datetime) -> None:
+            job.timers.discard(unsub)
+            self._async_start_send(job, reminder)
+
+        unsub = async_call_later(self.hass, delay, async_delayed_send)
+        job.timers.add(unsub)
+
+    @callback
+    def _async_start_send(self, job: ReminderJob, reminder: Dict[str, Any]) -> None:
+        """Run a send as a background task tracked by its job."""
+        task = self.hass.async_create_background_task(
+            self._async_send(job, reminder),
+            name=f"raccolta_differenziata reminder {job.entry.entry_id}",
+        )
+        job.tasks.add(task)
+        task.add_done_callback(job.tasks.discard)
+
+    async def _async_send(self, job: ReminderJob, reminder: Dict[str, Any]) -> None:
+        """Send a reminder within the concurrency budget."""
+        async with self._semaphore:
+            await async_send_reminder(self.hass, reminder, job.stats)
+
+    @callback
+    def async_shutdown(self, _event: Optional[Event] = None) -> None:
+        """Cancel the timer and every pending send."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        for jobs in self._slots.values():
+            for job in jobs.values():
+                job.async_cancel()
+
+
+@callback
+def async_get_reminder_wheel(hass: HomeAssistant) -> ReminderWheel:
+    """Return the reminder wheel shared by the integration."""
+    if DATA_REMINDERS not in hass.data:
+        wheel = hass.data[DATA_REMINDERS] = ReminderWheel(hass, async_get_clock(hass))
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, wheel.async_shutdown)
+    return hass.data[DATA_REMINDERS]
@@ -0,0 +1,114 @@
+"""Schedule computation for Raccolta Differenziata.
+
+This module has no Home Assistant dependencies, so it can be driven by the
+simulation harness as well as by the coordinator and the reminders.
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+from .const import (
+    CONF_TIPO,
+    CONF_GIORNO,
+    CONF_FREQUENZA,
+    CONF_COLORE,
+    CONF_ICONA,
+    WEEKDAYS,
+    WEEKDAYS_EN,
+)
+
+
+def get_next_date(conferimento: Dict[str, Any], today: date) -> date:
+    """Calculate the next date for a specific waste collection."""
+    giorno = conferimento.get(CONF_GIORNO).lower()
+    frequenza = conferimento.get(CONF_FREQUENZA, "settimanale").lower()
+    
+    # Converti il giorno in indice numerico (0 = lunedì, 6 = domenica)
+    if giorno in WEEKDAYS:
+        day_index = WEEKDAYS.index(giorno)
+    elif giorno in WEEKDAYS_EN:
+        day_index = WEEKDAYS_EN.index(giorno)
+    else:
+        # Default a lunedì se il giorno non è valido
+        day_index = 0
+    
+    # Calcola il prossimo giorno della settimana
+    days_ahead = day_index - today.weekday()
+    if days_ahead <= 0:  # Se è oggi o è già passato questa settimana
+        days_ahead += 7
+    
+    next_date = today + timedelta(days=days_ahead)
+    
+    # Gestisci frequenze diverse da settimanale
+    if frequenza == "bisettimanale":
+        # Verifica se la prossima data è nella settimana corretta
+        # Assumiamo che la raccolta bisettimanale inizi dalla prima settimana dell'anno
+        week_number = next_date.isocalendar()[1]
+        if week_number % 2 != 1:  # Se non è una settimana dispari
+            next_date += timedelta(days=7)  # Aggiungi un'altra settimana
+    elif frequenza == "mensile":
+        # Assumiamo che la raccolta mensile sia il primo giorno specificato del mese
+        if next_date.day > 7:  # Se siamo oltre la prima settimana del mese
+            # Vai al prossimo mese
+            if next_date.month == 12:
+                next_month = 1
+                next_year = next_date.year + 1
+            else:
+                next_month = next_date.month + 1
+                next_year = next_date.year
+            
+            # Trova il primo giorno della settimana specificato nel prossimo mese
+            first_day = date(next_year, next_month, 1)
+            days_ahead = (day_index - first_day.weekday()) % 7
+            next_date = first_day + timedelta(days=days_ahead)
+    
+    return next_date
+
+
+def compute_upcoming(conferimenti: List[Dict[str, Any]], today: date) -> List[Dict[str, Any]]:
+    """Return the next occurrence of every waste collection, sorted by date."""
+    upcoming = []
+    
+    for conferimento in conferimenti:
+        next_date = get_next_date(conferimento, today)
+        upcoming.append({
+            "date": next_date,
+            "tipo": conferimento.get(CONF_TIPO),
+            "icon": conferimento.get(CONF_ICONA, "mdi:recycle"),
+            "color": conferimento.get(CONF_COLORE, "#4CAF50"),
+            "frequency": conferimento.get(CONF_FREQUENZA),
+        })
+    
+    # Ordina per data
+    upcoming.sort(key=lambda x: x["date"])
+    return upcoming
+
+
+def materialize_schedule(conferimenti: List[Dict[str, Any]], today: date, horizon: int) -> Dict[str, Any]:
+    """Return every collection within the horizon as parallel arrays.
+
+    Occurrences are sorted by date and the arrays ``dates``, ``types`` and
+    ``colors`` share the same index, so clients read the whole window without
+    a dict per item.
+    """
+    end = today + timedelta(days=horizon)
+    occurrences = []
+    
+    for conferimento in conferimenti:
+        next_date = get_next_date(conferimento, today)
+        while next_date <= end:
+            occurrences.append((
+                next_date,
+                conferimento.get(CONF_TIPO),
+                conferimento.get(CONF_COLORE, "#4CAF50"),
+            ))
+            next_date = get_next_date(conferimento, next_date)
+    
+    # Ordina per data
+    occurrences.sort(key=lambda x: x[0])
+    return {
+        "start": today.isoformat(),
+        "horizon": horizon,
+        "dates": [occurrence[0].isoformat() for occurrence in occurrences],
+        "types": [occurrence[1] for occurrence in occurrences],
+        "colors": [occurrence[2] for occurrence in occurrences],
+    }
@@ -1,11 +1,11 @@
 """Sensor platform for Raccolta Differenziata integration."""
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Any, Dict, List, Optional
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_ICON, CONF_NAME
+from homeassistant.const import CONF_ICON, CONF_NAME, EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed, CoordinatorEntity
@@ -14,15 +14,15 @@ from homeassistant.util import dt as dt_util
 from .const import (
     DOMAIN,
     CONF_CONFERIMENTI,
-    CONF_TIPO,
-    CONF_GIORNO,
-    CONF_FREQUENZA,
-    CONF_COLORE,
-    CONF_ICONA,
+    CONF_ORIZZONTE,
+    DATA_COORDINATORS,
+    DEFAULT_SCHEDULE_HORIZON,
     TRANSLATIONS,
     WEEKDAYS,
-    WEEKDAYS_EN,
 )
+from .clock import Clock, async_get_clock
+from .schedule import compute_upcoming, materialize_schedule
+from .stats import EntryStats, async_get_entry_stats
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,14 +34,25 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         return
     
     # Crea un coordinatore per aggiornare i dati
-    coordinator = RaccoltaDifferenziataCoordinator(hass, conferimenti)
+    coordinator = RaccoltaDifferenziataCoordinator(
+        hass,
+        conferimenti,
+        async_get_entry_stats(hass, entry),
+        async_get_clock(hass),
+    )
     await coordinator.async_config_entry_first_refresh()
+    hass.data.setdefault(DATA_COORDINATORS, {})[entry.entry_id] = coordinator
     
     # Crea i sensori
     sensors = [
         RaccoltaDifferenziataSensor(coordinator, 0, "next"),  # Prossimo conferimento
         RaccoltaDifferenziataSensor(coordinator, 1, "next_plus_one"),  # Secondo conferimento
         RaccoltaDifferenziataSensor(coordinator, 2, "next_plus_two"),  # Terzo conferimento
+        RaccoltaDifferenziataDaysUntilSensor(coordinator, entry, 0, "next"),  # Giorni al prossimo conferimento
+        RaccoltaDifferenziataDaysUntilSensor(coordinator, entry, 1, "next_plus_one"),  # Giorni al secondo conferimento
+        RaccoltaDifferenziataDaysUntilSensor(coordinator, entry, 2, "next_plus_two"),  # Giorni al terzo conferimento
+        RaccoltaDifferenziataStatsSensor(coordinator, entry.entry_id),  # Statistiche di debug (disabilitato)
+        RaccoltaDifferenziataScheduleSensor(coordinator, entry),  # Calendario compatto (disabilitato)
     ]
     
     async_add_entities(sensors, True)
@@ -50,7 +61,13 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
 class RaccoltaDifferenziataCoordinator(DataUpdateCoordinator):
     """Class to manage fetching Raccolta Differenziata data."""
 
-    def __init__(self, hass: HomeAssistant, conferimenti: List[Dict[str, Any]]) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        conferimenti: List[Dict[str, Any]],
+        stats: Optional[EntryStats] = None,
+        clock: Optional[Clock] = None,
+    ) -> None:
         """Initialize the coordinator."""
         super().__init__(
             hass,
@@ -60,82 +77,63 @@ class RaccoltaDifferenziataCoordinator(DataUpdateCoordinator):
         )
         self.conferimenti = conferimenti
         self.upcoming_collections = []
+        self.stats = stats or EntryStats()
+        self.clock = clock or Clock()
+        # Versione del calendario: cambia solo con il giorno o con i conferimenti
+        self.schedule_version = 0
+        self._schedule_today = None
+        self._schedule_fingerprint = None
+        self._schedule_cache: Dict[int, Dict[str, Any]] = {}
+        self._schedule_cache_version = None
 
     async def _async_update_data(self) -> Dict[str, Any]:
         """Fetch data from API endpoint."""
         try:
-            # Calcola i prossimi conferimenti
-            today = datetime.now().date()
-            upcoming = []
-            
-            for conferimento in self.conferimenti:
-                next_date = self._get_next_date(conferimento, today)
-                upcoming.append({
-                    "date": next_date,
-                    "tipo": conferimento.get(CONF_TIPO),
-                    "icon": conferimento.get(CONF_ICONA, "mdi:recycle"),
-                    "color": conferimento.get(CONF_COLORE, "#4CAF50"),
-                    "frequency": conferimento.get(CONF_FREQUENZA),
-                })
-            
-            # Ordina per data
-            upcoming.sort(key=lambda x: x["date"])
-            self.upcoming_collections = upcoming
+            with self.stats.timed("refresh"):
+                # Calcola i prossimi conferimenti
+                today = self.clock.today()
+                upcoming = compute_upcoming(self.conferimenti, today)
+                self.upcoming_collections = upcoming
+                
+                fingerprint = (today, tuple(tuple(sorted(c.items())) for c in self.conferimenti))
+                if fingerprint != self._schedule_fingerprint:
+                    self._schedule_fingerprint = fingerprint
+                    self._schedule_today = today
+                    self.schedule_version += 1
+                self.stats.increment("recomputes")
             
             return {"collections": upcoming}
         except Exception as err:
+            self.stats.increment("refresh_failures")
             raise UpdateFailed(f"Error updating Raccolta Differenziata data: {err}") from err
 
-    def _get_next_date(self, conferimento: Dict[str, Any], today: datetime.date) -> datetime.date:
-        """Calculate the next date for a specific waste collection."""
-        giorno = conferimento.get(CONF_GIORNO).lower()
-        frequenza = conferimento.get(CONF_FREQUENZA, "settimanale").lower()
-        
-        # Converti il giorno in indice numerico (0 = lunedì, 6 = domenica)
-        if giorno in WEEKDAYS:
-            day_index = WEEKDAYS.index(giorno)
-        elif giorno in WEEKDAYS_EN:
-            day_index = WEEKDAYS_EN.index(giorno)
-        else:
-            # Default a lunedì se il giorno non è valido
-            day_index = 0
-        
-        # Calcola il prossimo giorno della settimana
-        days_ahead = day_index - today.weekday()
-        if days_ahead <= 0:  # Se è oggi o è già passato questa settimana
-            days_ahead += 7
-        
-        next_date = today + timedelta(days=days_ahead)
+    def get_schedule(self, horizon: int) -> Dict[str, Any]:
+        """Return the upcoming collections within the horizon in columnar form.
+
+        The result is materialized once per schedule version and horizon; the
+        same object is returned until the version changes.
+        """
+        if self._schedule_cache_version != self.schedule_version:
+            self._schedule_cache = {}
+            self._schedule_cache_version = self.schedule_version
         
-        # Gestisci frequenze diverse da settimanale
-        if frequenza == "bisettimanale":
-            # Verifica se la prossima data è nella settimana corretta
-            # Assumiamo che la raccolta bisettimanale inizi dalla prima settimana dell'anno
-            week_number = next_date.isocalendar()[1]
-            if week_number % 2 != 1:  # Se non è una settimana dispari
-                next_date += timedelta(days=7)  # Aggiungi un'altra settimana
-        elif frequenza == "mensile":
-            # Assumiamo che la raccolta mensile sia il primo giorno specificato del mese
-            if next_date.day > 7:  # Se siamo oltre la prima settimana del mese
-                # Vai al prossimo mese
-                if next_date.month == 12:
-                    next_month = 1
-                    next_year = next_date.year + 1
-                else:
-                    next_month = next_date.month + 1
-                    next_year = next_date.year
-                
-                # Trova il primo giorno della settimana specificato nel prossimo mese
-                first_day = datetime(next_year, next_month, 1).date()
-                days_ahead = (day_index - first_day.weekday()) % 7
-                next_date = first_day + timedelta(days=days_ahead)
+        schedule = self._schedule_cache.get(horizon)
+        self.stats.record_cache("schedule", schedule is not None)
+        if schedule is None:
+            with self.stats.timed("materialize"):
+                schedule = materialize_schedule(self.conferimenti, self._schedule_today, horizon)
+            schedule["version"] = self.schedule_version
+            self._schedule_cache[horizon] = schedule
         
-        return next_date
+        return schedule
 
 
 class RaccoltaDifferenziataSensor(CoordinatorEntity, SensorEntity):
     """Representation of a Raccolta Differenziata sensor."""
 
+    # Attributi statici o già registrati dal sensore numerico: non salvarli nel recorder
+    _unrecorded_attributes = frozenset({"icon", "color", "frequency", "days_until"})
+
     def __init__(self, coordinator: RaccoltaDifferenziataCoordinator, index: int, sensor_type: str) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
@@ -150,6 +148,12 @@ class RaccoltaDifferenziataSensor(CoordinatorEntity, SensorEntity):
         """Return if entity is available."""
         return self.coordinator.last_update_success and len(self.coordinator.upcoming_collections) > self.index
 
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state to the state machine and count the write."""
+        self.coordinator.stats.increment("state_writes")
+        super().async_write_ha_state()
+
     @property
     def state(self) -> Optional[str]:
         """Return the state of the sensor."""
@@ -177,6 +181,118 @@ class RaccoltaDifferenziataSensor(CoordinatorEntity, SensorEntity):
             attrs["icon"] = collection["icon"]
             attrs["color"] = collection["color"]
             attrs["frequency"] = collection["frequency"]
-            attrs["days_until"] = (date - datetime.now().date()).days
+            attrs["days_until"] = (date - self.coordinator.clock.today()).days
         
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class RaccoltaDifferenziataDaysUntilSensor(CoordinatorEntity, SensorEntity):
+    """Numeric sensor with the days left until a Raccolta Differenziata collection."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.DAYS
+
+    def __init__(
+        self,
+        coordinator: RaccoltaDifferenziataCoordinator,
+        entry: ConfigEntry,
+        index: int,
+        sensor_type: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.index = index
+        self.sensor_type = sensor_type
+        self._attr_unique_id = f"{DOMAIN}_{entry.entry_id}_{sensor_type}_days_until"
+        self._attr_name = f"Raccolta Differenziata {sensor_type.replace('_', ' ').title()} Days Until"
+        self._attr_icon = "mdi:calendar-clock"
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return self.coordinator.last_update_success and len(self.coordinator.upcoming_collections) > self.index
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state to the state machine and count the write."""
+        self.coordinator.stats.increment("state_writes")
+        super().async_write_ha_state()
+
+    @property
+    def native_value(self) -> Optional[int]:
+        """Return the number of days until the collection."""
+        if not self.available:
+            return None
+
+        collection = self.coordinator.upcoming_collections[self.index]
+        return (collection["date"] - self.coordinator.clock.today()).days
+
+
+class RaccoltaDifferenziataStatsSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor exposing the performance statistics of an entry."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    # Cambiano a ogni aggiornamento: non salvarli nel recorder
+    _unrecorded_attributes = frozenset({"timings", "counters", "caches"})
+
+    def __init__(self, coordinator: RaccoltaDifferenziataCoordinator, entry_id: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{DOMAIN}_{entry_id}_stats"
+        self._attr_name = "Raccolta Differenziata Stats"
+        self._attr_icon = "mdi:chart-box-outline"
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of schedule recomputes."""
+        return self.coordinator.stats.counters.get("recomputes", 0)
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the collected statistics."""
+        return self.coordinator.stats.as_dict()
+
+
+class RaccoltaDifferenziataScheduleSensor(CoordinatorEntity, SensorEntity):
+    """Aggregate sensor exposing the upcoming collections as parallel arrays."""
+
+    _attr_entity_registry_enabled_default = False
+    # Possono essere lunghi e sono ricalcolabili: non salvarli nel recorder
+    _unrecorded_attributes = frozenset({"start", "horizon", "version", "dates", "types", "colors"})
+
+    def __init__(self, coordinator: RaccoltaDifferenziataCoordinator, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entry = entry
+        self._attr_unique_id = f"{DOMAIN}_{entry.entry_id}_schedule"
+        self._attr_name = "Raccolta Differenziata Schedule"
+        self._attr_icon = "mdi:calendar-multiple"
+        self._schedule: Dict[str, Any] = {"dates": []}
+
+    async def async_added_to_hass(self) -> None:
+        """Fetch the schedule before the first state write."""
+        await super().async_added_to_hass()
+        self._update_schedule()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Fetch the schedule once and write the state."""
+        self._update_schedule()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _update_schedule(self) -> None:
+        """Fetch the materialized schedule for the configured horizon."""
+        horizon = self.entry.options.get(CONF_ORIZZONTE, DEFAULT_SCHEDULE_HORIZON)
+        self._schedule = self.coordinator.get_schedule(horizon)
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of collections within the horizon."""
+        return len(self._schedule["dates"])
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the schedule as parallel arrays."""
+        return self._schedule
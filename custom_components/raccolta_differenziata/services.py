@@ -3,9 +3,8 @@ import logging
 from typing import Any, Dict, List
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers.entity_platform import async_get_platforms
 
 from .const import (
     DOMAIN,
@@ -15,14 +14,52 @@ from .const import (
     CONF_FREQUENZA,
     CONF_COLORE,
     CONF_ICONA,
+    CONF_ORIZZONTE,
+    DATA_COORDINATORS,
+    DEFAULT_SCHEDULE_HORIZON,
+    MAX_SCHEDULE_HORIZON,
     DEFAULT_ICON,
     DEFAULT_COLOR,
     DEFAULT_FREQUENCY,
     WEEKDAYS,
 )
+from .clock import async_get_clock
+from .schedule import materialize_schedule
+from .stats import async_get_entry_stats
+from .write_queue import Mutation, async_get_write_queue
 
 _LOGGER = logging.getLogger(__name__)
 
+@callback
+def _async_apply_to_coordinator(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Hand the committed collections to the coordinator of the entry."""
+    coordinator = hass.data.get(DATA_COORDINATORS, {}).get(entry.entry_id)
+    if coordinator is None:
+        # Nessun sensore creato all'avvio (nessun conferimento): ricarica l'entry
+        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+        return
+    
+    coordinator.conferimenti = entry.data.get(CONF_CONFERIMENTI, [])
+    hass.async_create_task(coordinator.async_request_refresh())
+
+def _get_entry(hass: HomeAssistant) -> ConfigEntry:
+    """Return the config entry targeted by the services."""
+    entries = hass.config_entries.async_entries(DOMAIN)
+    if not entries:
+        raise HomeAssistantError("Nessuna configurazione trovata per Raccolta Differenziata")
+    return entries[0]  # Usa la prima entry trovata
+
+async def _async_submit(hass: HomeAssistant, mutation: Mutation) -> None:
+    """Queue a mutation on the config entry and wait for it to be saved."""
+    entry = _get_entry(hass)
+    queue = async_get_write_queue(
+        hass,
+        entry,
+        lambda: _async_apply_to_coordinator(hass, entry),
+        stats=async_get_entry_stats(hass, entry),
+    )
+    await queue.async_submit(mutation)
+
 async def async_setup_services(hass: HomeAssistant) -> None:
     """Set up services for Raccolta Differenziata integration."""
     
@@ -33,36 +70,19 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         if not tipo:
             raise HomeAssistantError("Tipo di conferimento non specificato")
         
-        # Trova l'entry di configurazione
-        entries = hass.config_entries.async_entries(DOMAIN)
-        if not entries:
-            raise HomeAssistantError("Nessuna configurazione trovata per Raccolta Differenziata")
-        
-        entry = entries[0]  # Usa la prima entry trovata
-        data = dict(entry.data)
-        conferimenti = list(data.get(CONF_CONFERIMENTI, []))
-        
-        # Trova il conferimento da aggiornare
-        for i, conferimento in enumerate(conferimenti):
-            if conferimento.get(CONF_TIPO) == tipo:
-                # Aggiorna i campi specificati
-                for field in [CONF_GIORNO, CONF_FREQUENZA, CONF_COLORE, CONF_ICONA]:
-                    if field in call.data:
-                        conferimenti[i][field] = call.data[field]
-                
-                # Aggiorna la configurazione
-                data[CONF_CONFERIMENTI] = conferimenti
-                hass.config_entries.async_update_entry(entry, data=data)
-                
-                # Aggiorna i sensori
-                for platform in async_get_platforms(hass, DOMAIN):
-                    for entity in platform.entities.values():
-                        if hasattr(entity, "async_schedule_update_ha_state"):
-                            await entity.async_schedule_update_ha_state(True)
-                
-                return
-        
-        raise HomeAssistantError(f"Conferimento '{tipo}' non trovato")
+        def mutation(conferimenti: List[Dict[str, Any]]) -> None:
+            # Trova il conferimento da aggiornare
+            for conferimento in conferimenti:
+                if conferimento.get(CONF_TIPO) == tipo:
+                    # Aggiorna i campi specificati
+                    for field in [CONF_GIORNO, CONF_FREQUENZA, CONF_COLORE, CONF_ICONA]:
+                        if field in call.data:
+                            conferimento[field] = call.data[field]
+                    return
+            
+            raise HomeAssistantError(f"Conferimento '{tipo}' non trovato")
+        
+        await _async_submit(hass, mutation)
     
     @callback
     async def add_collection(call: ServiceCall) -> None:
@@ -78,38 +98,22 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         if giorno.lower() not in [day.lower() for day in WEEKDAYS]:
             raise HomeAssistantError(f"Giorno non valido: {giorno}")
         
-        # Trova l'entry di configurazione
-        entries = hass.config_entries.async_entries(DOMAIN)
-        if not entries:
-            raise HomeAssistantError("Nessuna configurazione trovata per Raccolta Differenziata")
-        
-        entry = entries[0]  # Usa la prima entry trovata
-        data = dict(entry.data)
-        conferimenti = list(data.get(CONF_CONFERIMENTI, []))
-        
-        # Verifica se il tipo esiste già
-        for conferimento in conferimenti:
-            if conferimento.get(CONF_TIPO) == tipo:
-                raise HomeAssistantError(f"Conferimento '{tipo}' già esistente")
-        
-        # Aggiungi il nuovo conferimento
-        conferimenti.append({
-            CONF_TIPO: tipo,
-            CONF_GIORNO: giorno,
-            CONF_FREQUENZA: frequenza,
-            CONF_COLORE: call.data.get(CONF_COLORE, DEFAULT_COLOR),
-            CONF_ICONA: call.data.get(CONF_ICONA, DEFAULT_ICON),
-        })
-        
-        # Aggiorna la configurazione
-        data[CONF_CONFERIMENTI] = conferimenti
-        hass.config_entries.async_update_entry(entry, data=data)
-        
-        # Aggiorna i sensori
-        for platform in async_get_platforms(hass, DOMAIN):
-            for entity in platform.entities.values():
-                if hasattr(entity, "async_schedule_update_ha_state"):
-                    await entity.async_schedule_update_ha_state(True)
+        def mutation(conferimenti: List[Dict[str, Any]]) -> None:
+            # Verifica se il tipo esiste già
+            for conferimento in conferimenti:
+                if conferimento.get(CONF_TIPO) == tipo:
+                    raise HomeAssistantError(f"Conferimento '{tipo}' già esistente")
+            
+            # Aggiungi il nuovo conferimento
+            conferimenti.append({
+                CONF_TIPO: tipo,
+                CONF_GIORNO: giorno,
+                CONF_FREQUENZA: frequenza,
+                CONF_COLORE: call.data.get(CONF_COLORE, DEFAULT_COLOR),
+                CONF_ICONA: call.data.get(CONF_ICONA, DEFAULT_ICON),
+            })
+        
+        await _async_submit(hass, mutation)
     
     @callback
     async def remove_collection(call: ServiceCall) -> None:
@@ -118,42 +122,49 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         if not tipo:
             raise HomeAssistantError("Tipo di conferimento non specificato")
         
-        # Trova l'entry di configurazione
-        entries = hass.config_entries.async_entries(DOMAIN)
-        if not entries:
-            raise HomeAssistantError("Nessuna configurazione trovata per Raccolta Differenziata")
+        def mutation(conferimenti: List[Dict[str, Any]]) -> None:
+            # Trova e rimuovi il conferimento
+            for i, conferimento in enumerate(conferimenti):
+                if conferimento.get(CONF_TIPO) == tipo:
+                    del conferimenti[i]
+                    return
+            
+            raise HomeAssistantError(f"Conferimento '{tipo}' non trovato")
         
-        entry = entries[0]  # Usa la prima entry trovata
-        data = dict(entry.data)
-        conferimenti = list(data.get(CONF_CONFERIMENTI, []))
-        
-        # Trova e rimuovi il conferimento
-        for i, conferimento in enumerate(conferimenti):
-            if conferimento.get(CONF_TIPO) == tipo:
-                del conferimenti[i]
-                
-                # Aggiorna la configurazione
-                data[CONF_CONFERIMENTI] = conferimenti
-                hass.config_entries.async_update_entry(entry, data=data)
-                
-                # Aggiorna i sensori
-                for platform in async_get_platforms(hass, DOMAIN):
-                    for entity in platform.entities.values():
-                        if hasattr(entity, "async_schedule_update_ha_state"):
-                            await entity.async_schedule_update_ha_state(True)
-                
-                return
-        
-        raise HomeAssistantError(f"Conferimento '{tipo}' non trovato")
+        await _async_submit(hass, mutation)
+    
+    async def get_schedule(call: ServiceCall) -> ServiceResponse:
+        """Return the upcoming waste collections as parallel arrays."""
+        entry = _get_entry(hass)
+        giorni = call.data.get("giorni", entry.options.get(CONF_ORIZZONTE, DEFAULT_SCHEDULE_HORIZON))
+        try:
+            giorni = int(giorni)
+        except (TypeError, ValueError) as err:
+            raise HomeAssistantError(f"Numero di giorni non valido: {giorni}") from err
+        if giorni < 1 or giorni > MAX_SCHEDULE_HORIZON:
+            raise HomeAssistantError(f"Numero di giorni non valido: {giorni}")
+        
+        coordinator = hass.data.get(DATA_COORDINATORS, {}).get(entry.entry_id)
+        if coordinator is None:
+            # Nessun conferimento configurato: stessa forma, liste vuote
+            schedule = materialize_schedule([], async_get_clock(hass).today(), giorni)
+            schedule["version"] = 0
+            return schedule
+        
+        return coordinator.get_schedule(giorni)
     
     # Registra i servizi
     hass.services.async_register(DOMAIN, "update_collection", update_collection)
     hass.services.async_register(DOMAIN, "add_collection", add_collection)
     hass.services.async_register(DOMAIN, "remove_collection", remove_collection)
+    hass.services.async_register(
+        DOMAIN, "get_schedule", get_schedule, supports_response=SupportsResponse.ONLY
+    )
 
 async def async_unload_services(hass: HomeAssistant) -> None:
     """Unload Raccolta Differenziata services."""
     # Rimuovi i servizi registrati
     hass.services.async_remove(DOMAIN, "update_collection")
     hass.services.async_remove(DOMAIN, "add_collection")
-    hass.services.async_remove(DOMAIN, "remove_collection")
\ No newline at end of file
+    hass.services.async_remove(DOMAIN, "remove_collection")
+    hass.services.async_remove(DOMAIN, "get_schedule")
\ No newline at end of file
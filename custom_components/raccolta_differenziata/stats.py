@@ -0,0 +1,117 @@
+"""Lightweight performance counters for Raccolta Differenziata."""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_STATS, STATS_BUCKETS_MS
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations in milliseconds."""
+
+    __slots__ = ("buckets", "count", "total", "max", "last")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        # Un bucket per ogni limite più uno per i valori oltre l'ultimo
+        self.buckets: List[int] = [0] * (len(STATS_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def record(self, value_ms: float) -> None:
+        """Add a duration to the histogram."""
+        self.buckets[bisect_left(STATS_BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        self.last = value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the histogram as a serializable dict."""
+        labels = [f"<={bound}ms" for bound in STATS_BUCKETS_MS] + [f">{STATS_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else None,
+            "max_ms": round(self.max, 3),
+            "last_ms": round(self.last, 3),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class EntryStats:
+    """Timings, counters and cache hit rates of a config entry.
+
+    Recording is a few integer and float updates, so it stays enabled in
+    production.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.timings: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.caches: Dict[str, List[int]] = {}
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        """Measure the duration of the wrapped block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_timing(name, (time.perf_counter() - start) * 1000)
+
+    def record_timing(self, name: str, value_ms: float) -> None:
+        """Record a duration in milliseconds."""
+        histogram = self.timings.get(name)
+        if histogram is None:
+            histogram = self.timings[name] = Histogram()
+        histogram.record(value_ms)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Increment a counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_cache(self, name: str, hit: bool) -> None:
+        """Record a hit or a miss of a cache."""
+        hits_misses = self.caches.get(name)
+        if hits_misses is None:
+            hits_misses = self.caches[name] = [0, 0]
+        hits_misses[0 if hit else 1] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return all statistics as a serializable dict."""
+        caches = {}
+        for name, (hits, misses) in self.caches.items():
+            total = hits + misses
+            caches[name] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / total, 3) if total else None,
+            }
+        return {
+            "timings": {name: histogram.as_dict() for name, histogram in self.timings.items()},
+            "counters": dict(self.counters),
+            "caches": caches,
+        }
+
+
+@callback
+def async_get_entry_stats(hass: HomeAssistant, entry: ConfigEntry) -> EntryStats:
+    """Return the statistics of a config entry, creating them if needed."""
+    stats: Dict[str, EntryStats] = hass.data.setdefault(DATA_STATS, {})
+    if entry.entry_id not in stats:
+        stats[entry.entry_id] = EntryStats()
+    return stats[entry.entry_id]
+
+
+@callback
+def async_remove_entry_stats(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the statistics of a config entry."""
+    hass.data.get(DATA_STATS, {}).pop(entry.entry_id, None)
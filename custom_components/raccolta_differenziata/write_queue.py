@@ -0,0 +1,142 @@
+"""Serialized, coalescing write queue for Raccolta Differenziata config entries."""
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import (
+    CONF_CONFERIMENTI,
+    DATA_WRITE_QUEUES,
+    WRITE_QUEUE_DEBOUNCE,
+)
+from .stats import EntryStats
+
+_LOGGER = logging.getLogger(__name__)
+
+Mutation = Callable[[List[Dict[str, Any]]], None]
+
+
+class EntryWriteQueue:
+    """Serialize mutations of a config entry and persist them in batches.
+
+    Every mutation receives a private copy of the current ``conferimenti`` and
+    modifies it in place. Mutations submitted within the debounce window are
+    applied one after the other and written with a single entry update; each
+    caller is resolved only after that update has been committed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        on_commit: Optional[Callable[[], None]] = None,
+        debounce: float = WRITE_QUEUE_DEBOUNCE,
+        stats: Optional[EntryStats] = None,
+    ) -> None:
+        """Initialize the write queue."""
+        self.hass = hass
+        self.entry = entry
+        self.stats = stats or EntryStats()
+        self._on_commit = on_commit
+        self._debounce = debounce
+        self._pending: List[Tuple[Mutation, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def async_submit(self, mutation: Mutation) -> None:
+        """Queue a mutation and wait until it has been committed."""
+        future = self.hass.loop.create_future()
+        self._pending.append((mutation, future))
+        if self._flush_task is None:
+            self._flush_task = self.hass.async_create_task(self._async_flush())
+        await future
+
+    async def _async_flush(self) -> None:
+        """Apply all pending mutations and write them with one update."""
+        await asyncio.sleep(self._debounce)
+
+        # Da qui in poi non ci sono await: il batch è applicato senza interruzioni
+        with self.stats.timed("mutation_batch"):
+            # Le mutazioni che arrivano da qui in poi finiscono nel prossimo batch
+            batch, self._pending = self._pending, []
+            self._flush_task = None
+
+            data = dict(self.entry.data)
+            conferimenti = [dict(c) for c in data.get(CONF_CONFERIMENTI, [])]
+            results: List[Tuple[asyncio.Future, Optional[Exception]]] = []
+            committed = False
+
+            self.stats.increment("mutations", len(batch))
+            for mutation, future in batch:
+                # Una mutazione fallita non deve lasciare modifiche parziali
+                candidate = [dict(c) for c in conferimenti]
+                try:
+                    mutation(candidate)
+                except Exception as err:  # pylint: disable=broad-except
+                    self.stats.increment("mutation_failures")
+                    results.append((future, err))
+                    continue
+                conferimenti = candidate
+                results.append((future, None))
+
+            if any(err is None for _, err in results):
+                data[CONF_CONFERIMENTI] = conferimenti
+                try:
+                    if self.hass.config_entries.async_update_entry(self.entry, data=data):
+                        self.stats.increment("entry_writes")
+                except Exception as err:  # pylint: disable=broad-except
+                    self.stats.increment("entry_write_failures")
+                    _LOGGER.error("Error writing Raccolta Differenziata configuration: %s", err)
+                    results = [(future, exc or err) for future, exc in results]
+                else:
+                    committed = True
+
+            for future, err in results:
+                if future.done():
+                    continue
+                if err is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(err)
+
+        # Il salvataggio è già avvenuto: un errore qui non deve bloccare i chiamanti
+        if committed and self._on_commit is not None:
+            try:
+                self._on_commit()
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.error("Error applying Raccolta Differenziata configuration: %s", err)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel the pending flush and fail the callers still waiting."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        pending, self._pending = self._pending, []
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(HomeAssistantError("Configurazione scaricata prima del salvataggio"))
+
+
+@callback
+def async_get_write_queue(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    on_commit: Optional[Callable[[], None]] = None,
+    stats: Optional[EntryStats] = None,
+) -> EntryWriteQueue:
+    """Return the write queue for a config entry, creating it if needed."""
+    queues: Dict[str, EntryWriteQueue] = hass.data.setdefault(DATA_WRITE_QUEUES, {})
+    if entry.entry_id not in queues:
+        queues[entry.entry_id] = EntryWriteQueue(hass, entry, on_commit, stats=stats)
+    return queues[entry.entry_id]
+
+
+@callback
+def async_remove_write_queue(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Shut down and forget the write queue of a config entry."""
+    queue = hass.data.get(DATA_WRITE_QUEUES, {}).pop(entry.entry_id, None)
+    if queue is not None:
+        queue.async_shutdown()
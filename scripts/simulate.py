@@ -0,0 +1,308 @@
+"""Accelerated time-travel simulation for Raccolta Differenziata.
+
+Replays hourly refreshes of the real coordinator and the reminders of several
+entries, fired by the shared ReminderWheel through a stubbed point-in-time
+tracker, over several years against a stub ``hass`` driven by a ManualClock.
+Every computed occurrence, the materialized schedule and every reminder are
+checked against a slow day-by-day reference implementation.
+
+Requires Home Assistant to be installed (development environment)::
+
+    python scripts/simulate.py --years 10 --time-zone Europe/Rome
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "custom_components"))
+
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from raccolta_differenziata.clock import ManualClock  # noqa: E402
+from raccolta_differenziata.const import (  # noqa: E402
+    CONF_CONFERIMENTI,
+    CONF_TIPO,
+    CONF_GIORNO,
+    CONF_FREQUENZA,
+    DEFAULT_SCHEDULE_HORIZON,
+    FREQUENCY_WEEKLY,
+    FREQUENCY_BIWEEKLY,
+    FREQUENCY_MONTHLY,
+    NOTIFICATION_CONCURRENCY,
+    TRANSLATIONS,
+    WEEKDAYS,
+    WEEKDAYS_EN,
+)
+from raccolta_differenziata import reminders  # noqa: E402
+from raccolta_differenziata.reminders import ReminderJob, ReminderWheel  # noqa: E402
+from raccolta_differenziata.sensor import RaccoltaDifferenziataCoordinator  # noqa: E402
+from raccolta_differenziata.stats import EntryStats  # noqa: E402
+
+
+class StubConfig:
+    """Minimal stand-in for ``hass.config``."""
+
+    def __init__(self, language: str) -> None:
+        self.language = language
+
+
+class StubServices:
+    """Minimal stand-in for ``hass.services`` recording every call."""
+
+    def __init__(self) -> None:
+        self.calls: List[Tuple[str, str, Dict[str, Any]]] = []
+        self.queued: List[asyncio.Task] = []
+        self.running = 0
+        self.peak = 0
+
+    async def async_call(
+        self, domain: str, service: str, data: Dict[str, Any], blocking: bool = False
+    ) -> None:
+        # Come in HA: senza blocking la chiamata ritorna appena accodata
+        if not blocking:
+            self.queued.append(asyncio.create_task(self._async_run(domain, service, data)))
+            return
+        await self._async_run(domain, service, data)
+
+    async def _async_run(self, domain: str, service: str, data: Dict[str, Any]) -> None:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            # Un invio reale cede il controllo al loop mentre è in corso
+            await asyncio.sleep(0)
+            self.calls.append((domain, service, data))
+        finally:
+            self.running -= 1
+
+
+class StubHass:
+    """Minimal stand-in for ``hass``."""
+
+    def __init__(self, language: str) -> None:
+        self.config = StubConfig(language)
+        self.services = StubServices()
+        self.data: Dict[str, Any] = {}
+        self.loop = asyncio.get_running_loop()
+        self.tasks: List[asyncio.Task] = []
+
+    def async_create_background_task(self, target: Any, name: str) -> asyncio.Task:
+        task = self.loop.create_task(target, name=name)
+        self.tasks.append(task)
+        return task
+
+
+class StubEntry:
+    """Minimal stand-in for a config entry, without jitter."""
+
+    def __init__(self, entry_id: str, data: Dict[str, Any]) -> None:
+        self.entry_id = entry_id
+        self.data = data
+        self.options: Dict[str, Any] = {}
+
+
+def reference_next_date(conferimento: Dict[str, Any], today: date) -> date:
+    """Find the next collection by walking forward one day at a time."""
+    giorno = conferimento[CONF_GIORNO].lower()
+    frequenza = conferimento.get(CONF_FREQUENZA, FREQUENCY_WEEKLY).lower()
+    if giorno in WEEKDAYS:
+        day_index = WEEKDAYS.index(giorno)
+    elif giorno in WEEKDAYS_EN:
+        day_index = WEEKDAYS_EN.index(giorno)
+    else:
+        day_index = 0
+
+    candidate = today + timedelta(days=1)
+    while True:
+        if candidate.weekday() == day_index:
+            if frequenza == FREQUENCY_BIWEEKLY:
+                if candidate.isocalendar()[1] % 2 == 1:
+                    return candidate
+            elif frequenza == FREQUENCY_MONTHLY:
+                if candidate.day <= 7:
+                    return candidate
+            else:
+                return candidate
+        candidate += timedelta(days=1)
+
+
+def build_conferimenti() -> List[Dict[str, Any]]:
+    """Return one collection for every weekday and frequency."""
+    return [
+        {
+            CONF_TIPO: f"{giorno}-{frequenza}",
+            CONF_GIORNO: giorno,
+            CONF_FREQUENZA: frequenza,
+        }
+        for giorno in WEEKDAYS
+        for frequenza in (FREQUENCY_WEEKLY, FREQUENCY_BIWEEKLY, FREQUENCY_MONTHLY)
+    ]
+
+
+def build_refreshes(start: date, days: int) -> List[datetime]:
+    """Return the hourly refresh instants, in UTC, of the simulated period."""
+    tz = dt_util.get_default_time_zone()
+    first = datetime.combine(start, dt_time(0), tzinfo=tz).astimezone(timezone.utc)
+    last = datetime.combine(start + timedelta(days=days), dt_time(0), tzinfo=tz).astimezone(timezone.utc)
+
+    refreshes = []
+    instant = first
+    while instant < last:
+        refreshes.append(instant)
+        instant += timedelta(hours=1)
+    return refreshes
+
+
+async def async_simulate(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the simulation and return its report."""
+    dt_util.set_default_time_zone(dt_util.get_time_zone(args.time_zone))
+    tz = dt_util.get_default_time_zone()
+    hass = StubHass(args.language)
+    stats = EntryStats()
+    conferimenti = build_conferimenti()
+    translations = TRANSLATIONS.get(args.language, TRANSLATIONS["en"])
+    hour, minute = map(int, args.notify_at.split(":"))
+    days = int(args.years * 365.25)
+
+    refreshes = build_refreshes(args.start, days)
+    clock = ManualClock(refreshes[0])
+    coordinator = RaccoltaDifferenziataCoordinator(hass, conferimenti, stats, clock)
+    # Fuso orario ricavato senza passare da dt_util, per verificare l'orologio
+    zone = ZoneInfo(args.time_zone)
+    mismatches: List[str] = []
+    reminders_sent = 0
+    wheel_fires = 0
+    # Il riferimento è lento: calcolalo una sola volta per giorno simulato
+    reference: Dict[date, Dict[str, date]] = {}
+
+    def reference_for(day: date) -> Dict[str, date]:
+        if day not in reference:
+            reference[day] = {c[CONF_TIPO]: reference_next_date(c, day) for c in conferimenti}
+        return reference[day]
+
+    # La timer wheel arma un solo timer alla volta: lo registra qui invece che nel loop di HA
+    armed: List[Tuple[datetime, Callable[[datetime], None]]] = []
+
+    def track_point_in_time(_hass: Any, action: Callable[[datetime], None], when: datetime) -> Callable[[], None]:
+        timer = (when, action)
+        armed.append(timer)
+        return lambda: armed.remove(timer) if timer in armed else None
+
+    reminders.async_track_point_in_time = track_point_in_time
+    wheel = ReminderWheel(hass, clock)
+    for index in range(args.entries):
+        entry = StubEntry(f"entry_{index}", {CONF_CONFERIMENTI: conferimenti})
+        wheel.async_add_job(hour, minute, ReminderJob(entry, args.anticipo, stats))
+
+    async def async_fire_due(until: datetime) -> None:
+        nonlocal reminders_sent, wheel_fires
+        while armed and armed[0][0] <= until:
+            when, action = armed.pop(0)
+            clock.set(when)
+            today = clock.today()
+            wheel_fires += 1
+            local = when.astimezone(zone)
+            if (local.hour, local.minute) != (hour, minute):
+                mismatches.append(f"{when.isoformat()}: wheel fired at {local.time()}")
+
+            # Il calendario si riferisce al giorno dell'ultimo aggiornamento
+            schedule = coordinator.get_schedule(DEFAULT_SCHEDULE_HORIZON)
+            schedule_start = date.fromisoformat(schedule["start"])
+            schedule_dates = reference_for(schedule_start)
+            expected_window = []
+            end = schedule_start + timedelta(days=DEFAULT_SCHEDULE_HORIZON)
+            for conferimento in conferimenti:
+                next_date = schedule_dates[conferimento[CONF_TIPO]]
+                while next_date <= end:
+                    expected_window.append((next_date.isoformat(), conferimento[CONF_TIPO]))
+                    next_date = reference_next_date(conferimento, next_date)
+            if sorted(zip(schedule["dates"], schedule["types"])) != sorted(expected_window):
+                mismatches.append(f"{when.isoformat()}: schedule window differs")
+
+            hass.services.calls.clear()
+            action(when)
+            if hass.tasks:
+                await asyncio.gather(*hass.tasks)
+                hass.tasks.clear()
+            if hass.services.queued:
+                await asyncio.gather(*hass.services.queued)
+                hass.services.queued.clear()
+            reminders_sent += len(hass.services.calls)
+
+            expected_dates = reference_for(today)
+            expected_messages = []
+            for conferimento in conferimenti:
+                days_until = (expected_dates[conferimento[CONF_TIPO]] - today).days
+                if days_until <= args.anticipo:
+                    key = "notification_message_today" if days_until == 0 else "notification_message"
+                    expected_messages.append(translations[key].format(conferimento[CONF_TIPO]))
+            actual_messages = sorted(data["message"] for _, _, data in hass.services.calls)
+            if actual_messages != sorted(expected_messages * args.entries):
+                mismatches.append(f"{when.isoformat()}: reminders differ")
+
+    started = time.perf_counter()
+    for instant in refreshes:
+        await async_fire_due(instant)
+        clock.set(instant)
+        today = clock.today()
+
+        expected_today = instant.astimezone(zone).date()
+        if today != expected_today:
+            mismatches.append(f"{instant.isoformat()}: clock date {today} != {expected_today}")
+
+        data = await coordinator._async_update_data()  # pylint: disable=protected-access
+        expected = sorted((next_date, tipo) for tipo, next_date in reference_for(today).items())
+        actual = sorted((item["date"], item["tipo"]) for item in data["collections"])
+        if actual != expected:
+            mismatches.append(f"{instant.isoformat()}: occurrences differ")
+    elapsed = time.perf_counter() - started
+
+    if hass.services.peak > NOTIFICATION_CONCURRENCY:
+        mismatches.append(
+            f"{hass.services.peak} notify calls ran at once, budget is {NOTIFICATION_CONCURRENCY}"
+        )
+    if wheel_fires != days:
+        mismatches.append(f"wheel fired {wheel_fires} times in {days} days")
+
+    report = stats.as_dict()
+    return {
+        "time_zone": args.time_zone,
+        "start": args.start.isoformat(),
+        "end": refreshes[-1].astimezone(tz).isoformat(),
+        "refreshes": len(refreshes),
+        "wheel_fires": wheel_fires,
+        "reminders_sent": reminders_sent,
+        "peak_concurrent_sends": hass.services.peak,
+        "mismatches": len(mismatches),
+        "first_mismatches": mismatches[:10],
+        "elapsed_s": round(elapsed, 3),
+        "simulated_days_per_s": round(days / elapsed, 1) if elapsed else None,
+        "timings": report["timings"],
+        "caches": report["caches"],
+    }
+
+
+def main() -> int:
+    """Parse the arguments and run the simulation."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2024, 1, 1))
+    parser.add_argument("--time-zone", default="Europe/Rome")
+    parser.add_argument("--language", default="it")
+    parser.add_argument("--notify-at", default="19:00")
+    parser.add_argument("--anticipo", type=int, default=1)
+    parser.add_argument("--entries", type=int, default=3)
+    args = parser.parse_args()
+
+    report = asyncio.run(async_simulate(args))
+    print(json.dumps(report, indent=2, default=str))
+    return 1 if report["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())